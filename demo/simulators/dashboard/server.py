@@ -3,12 +3,23 @@
 AgentLog Dashboard - Web UI for monitoring all simulators
 """
 
-from flask import Flask, render_template, jsonify
+from flask import Flask, render_template, jsonify, request
+import orjson
 import requests
+from requests.adapters import HTTPAdapter, Retry
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
 import os
+import threading
+import time
+from datetime import datetime
 
 app = Flask(__name__)
 
+def _load():
+    """Parse the request body with orjson, skipping Flask's stdlib json path"""
+    return orjson.loads(request.get_data(cache=False))
+
 # Service URLs
 SERVICES = {
     'jira': 'http://mock-jira:8080',
@@ -16,68 +27,170 @@ SERVICES = {
     'slack': 'http://mock-slack:8082'
 }
 
+# Shared session with a keep-alive connection pool so repeated polls
+# reuse sockets instead of paying a TCP handshake per call; one cheap
+# retry smooths over a simulator restarting mid-poll
+SESSION = requests.Session()
+SESSION.mount('http://', HTTPAdapter(
+    pool_connections=8, pool_maxsize=16,
+    max_retries=Retry(total=1, backoff_factor=0.1)))
+
+# Sized for several concurrent dashboard requests (3 downstream calls
+# each) so one slow refresh never serializes the others behind it
+EXECUTOR = ThreadPoolExecutor(max_workers=int(os.getenv('FANOUT_WORKERS', 12)))
+
 @app.route('/')
 def index():
     """Render dashboard"""
     return render_template('index.html')
 
-@app.route('/api/stats', methods=['GET'])
-def get_stats():
-    """Get aggregated stats from all services"""
-    stats = {}
-    
-    # Get Jira tickets
+def parse_jira(data):
+    """Parse Jira ticket list"""
+    # Handle both array format and object format
+    if isinstance(data, list):
+        return {
+            'total': len(data),
+            'tickets': data[:10]  # Last 10
+        }
+    return {
+        'total': data.get('total', 0),
+        'tickets': data.get('tickets', [])[:10]
+    }
+
+def parse_pagerduty(data):
+    """Parse PagerDuty incident list"""
+    return {
+        'total': data.get('total', 0),
+        'incidents': data.get('incidents', [])[:10],  # Last 10
+        'stats': data.get('stats', {})
+    }
+
+def parse_slack(data):
+    """Parse Slack message list"""
+    # Handle both array format and object format
+    if isinstance(data, list):
+        return {
+            'total': len(data),
+            'messages': data[:10]  # Last 10
+        }
+    return {
+        'total': data.get('total', 0),
+        'messages': data.get('messages', [])[:10]
+    }
+
+# (name, url, parser, error payload) for the stats fan-out
+FAN_OUT = [
+    ('jira', f"{SERVICES['jira']}/tickets?limit=10", parse_jira,
+     {'total': 0, 'tickets': [], 'error': 'Service unavailable'}),
+    ('pagerduty', f"{SERVICES['pagerduty']}/incidents?limit=10", parse_pagerduty,
+     {'total': 0, 'incidents': [], 'error': 'Service unavailable'}),
+    ('slack', f"{SERVICES['slack']}/messages?limit=10", parse_slack,
+     {'total': 0, 'messages': [], 'error': 'Service unavailable'}),
+]
+
+# Last successful payload per service, served when a fresh fetch fails
+# so a transient outage doesn't blank out the UI
+_last_good = {'jira': None, 'pagerduty': None, 'slack': None}
+_last_good_lock = threading.Lock()
+
+# Short-lived cache so a burst of dashboard polls shares one fan-out
+STATS_TTL = float(os.getenv('STATS_TTL', 2))
+_stats_cache = {'expires': 0.0, 'value': None}
+_stats_lock = threading.Lock()
+_stats_inflight = None  # Event set once the in-flight fan-out completes
+
+def _safe_get(task):
+    """Fetch one service and parse it, falling back to stale or error data"""
+    name, url, parser, error_payload = task
     try:
-        resp = requests.get(f"{SERVICES['jira']}/tickets", timeout=2)
+        resp = SESSION.get(url, timeout=2)
         if resp.status_code == 200:
-            data = resp.json()
-            # Handle both array format and object format
-            if isinstance(data, list):
-                stats['jira'] = {
-                    'total': len(data),
-                    'tickets': data[:10]  # Last 10
-                }
-            else:
-                stats['jira'] = {
-                    'total': data.get('total', 0),
-                    'tickets': data.get('tickets', [])[:10]
-                }
+            payload = parser(resp.json())
+            with _last_good_lock:
+                _last_good[name] = payload
+            return name, payload
     except:
-        stats['jira'] = {'total': 0, 'tickets': [], 'error': 'Service unavailable'}
-    
-    # Get PagerDuty incidents
+        pass
+    # Serve the last successful payload (marked stale) over an empty error
+    with _last_good_lock:
+        stale = _last_good[name]
+    if stale is not None:
+        return name, {**stale, 'stale_at': datetime.now().isoformat()}
+    return name, error_payload
+
+def _stats_response(stats):
+    """Build the /api/stats response with browser caching enabled"""
+    body = orjson.dumps(stats)
+    etag = '"%s"' % hashlib.blake2b(body, digest_size=8).hexdigest()
+    if request.headers.get('If-None-Match') == etag:
+        return '', 304
+    resp = app.response_class(body, mimetype='application/json')
+    resp.headers['ETag'] = etag
+    resp.headers['Cache-Control'] = f'public, max-age={int(STATS_TTL)}'
+    return resp
+
+@app.route('/api/stats', methods=['GET'])
+def get_stats():
+    """Get aggregated stats from all services"""
+    global _stats_inflight
+
+    with _stats_lock:
+        if time.monotonic() < _stats_cache['expires']:
+            return _stats_response(_stats_cache['value'])
+        inflight = _stats_inflight
+        if inflight is None:
+            # First caller past the TTL performs the fan-out
+            _stats_inflight = threading.Event()
+
+    if inflight is not None:
+        # Another request is already fanning out; share its result
+        inflight.wait(timeout=5)
+        with _stats_lock:
+            if _stats_cache['value'] is not None:
+                return _stats_response(_stats_cache['value'])
+
+    stats = dict(EXECUTOR.map(_safe_get, FAN_OUT))
+
+    with _stats_lock:
+        _stats_cache['value'] = stats
+        _stats_cache['expires'] = time.monotonic() + STATS_TTL
+        event = _stats_inflight
+        _stats_inflight = None
+    if event is not None:
+        event.set()
+
+    return _stats_response(stats)
+
+def _run_subrequest(sub):
+    """Execute one {service, path} subrequest and capture its outcome"""
+    if not isinstance(sub, dict):
+        return {'status': 400, 'body': {'error': 'Expected a {service, path} object'}}
+    service = sub.get('service')
+    base = SERVICES.get(service)
+    if base is None:
+        return {'status': 404, 'body': {'error': 'Unknown service'}}
     try:
-        resp = requests.get(f"{SERVICES['pagerduty']}/incidents", timeout=2)
-        if resp.status_code == 200:
-            data = resp.json()
-            stats['pagerduty'] = {
-                'total': data.get('total', 0),
-                'incidents': data.get('incidents', [])[:10],  # Last 10
-                'stats': data.get('stats', {})
-            }
+        resp = SESSION.get(f"{base}{sub.get('path', '/')}", timeout=2)
+        try:
+            body = resp.json()
+        except ValueError:
+            body = resp.text
+        return {'status': resp.status_code, 'body': body}
     except:
-        stats['pagerduty'] = {'total': 0, 'incidents': [], 'error': 'Service unavailable'}
-    
-    # Get Slack messages
+        return {'status': 502, 'body': {'error': 'Service unavailable'}}
+
+@app.route('/api/batch', methods=['POST'])
+def batch():
+    """Run a list of {service, path} subrequests in one HTTP round trip"""
     try:
-        resp = requests.get(f"{SERVICES['slack']}/messages", timeout=2)
-        if resp.status_code == 200:
-            data = resp.json()
-            # Handle both array format and object format
-            if isinstance(data, list):
-                stats['slack'] = {
-                    'total': len(data),
-                    'messages': data[:10]  # Last 10
-                }
-            else:
-                stats['slack'] = {
-                    'total': data.get('total', 0),
-                    'messages': data.get('messages', [])[:10]
-                }
-    except:
-        stats['slack'] = {'total': 0, 'messages': [], 'error': 'Service unavailable'}
-    
-    return jsonify(stats)
+        subrequests = _load()
+    except orjson.JSONDecodeError:
+        subrequests = None
+    if not isinstance(subrequests, list):
+        return jsonify({'error': 'Expected a JSON list of {service, path}'}), 400
+    # One request/response on the wire; still parallel internally
+    results = list(EXECUTOR.map(_run_subrequest, subrequests))
+    return jsonify(results)
 
 @app.route('/api/clear/<service>', methods=['POST'])
 def clear_service(service):
@@ -92,7 +205,7 @@ def clear_service(service):
             'slack': '/messages/clear'
         }
         
-        resp = requests.post(f"{SERVICES[service]}{endpoint_map[service]}", timeout=2)
+        resp = SESSION.post(f"{SERVICES[service]}{endpoint_map[service]}", timeout=2)
         if resp.status_code == 200:
             return jsonify({'success': True})
         else:
@@ -102,4 +215,4 @@ def clear_service(service):
 
 if __name__ == '__main__':
     port = int(os.getenv('PORT', 3000))
-    app.run(host='0.0.0.0', port=port, debug=False)
+    app.run(host='0.0.0.0', port=port, debug=False, threaded=True)
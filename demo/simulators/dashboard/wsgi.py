@@ -0,0 +1,9 @@
+#!/usr/bin/env python3
+"""
+WSGI entry point: gunicorn -k gevent -w 4 --worker-connections 1000 wsgi:app
+
+The dashboard holds no authoritative state (its stats cache is a
+short-lived per-process optimization), so it scales across workers.
+"""
+
+from server import app  # noqa: F401
@@ -4,20 +4,99 @@ Mock Jira Server - Simulates Jira REST API for ticket creation
 Receives webhook calls from AgentLog and displays them beautifully
 """
 
-from flask import Flask, request, jsonify, render_template
-import json
+from flask import Flask, request, jsonify, render_template, Response, stream_with_context
+import orjson
+import itertools
 import os
+import queue
+import threading
+import time
+from collections import deque
 from datetime import datetime
 from colorama import Fore, Back, Style, init
 
 # Initialize colorama
 init(autoreset=True)
 
+# Set VERBOSE=0 to keep colorized printing off the request path
+VERBOSE = os.getenv('VERBOSE', '1') == '1'
+
 app = Flask(__name__)
 
-# Store tickets in memory
-tickets = []
-ticket_counter = 1000
+def _load():
+    """Parse the request body with orjson, skipping Flask's stdlib json path"""
+    return orjson.loads(request.get_data(cache=False))
+
+def stream_json_array(items):
+    """Yield a JSON array chunk by chunk instead of building one big blob"""
+    yield b'['
+    first = True
+    for item in items:
+        if not first:
+            yield b','
+        yield orjson.dumps(item)
+        first = False
+    yield b']'
+
+# Store tickets in memory (dict gives O(1) key lookups, bounded deque
+# preserves creation order while capping memory via automatic eviction)
+STORE_MAX = int(os.getenv('STORE_MAX', 10000))
+tickets = deque(maxlen=STORE_MAX)
+tickets_by_key = {}
+# itertools.count gives atomic-under-the-GIL increments, so concurrent
+# workers can't mint duplicate ticket keys
+ticket_counter = itertools.count(1000)
+
+# Bumped on every insert/clear; listing ETags derive from it so an
+# unchanged store turns a poll into a 304 without rehashing the body
+_store_version = 0
+
+def _etag_for(*parts):
+    """Cheap ETag from the store version and the requested window"""
+    return '"%s"' % '-'.join(str(p) for p in parts)
+
+def _int_arg(name, default):
+    """Read a non-negative integer query param, falling back on bad input"""
+    try:
+        return max(0, int(request.args.get(name, default)))
+    except ValueError:
+        return default
+
+# Pretty-printing runs on a background thread so handlers return as soon
+# as the store is updated; on overflow prints are dropped rather than
+# letting a slow console backpressure ingestion
+_print_q = queue.Queue(maxsize=1024)
+_dropped_prints = 0
+
+def _printer():
+    """Drain the print queue"""
+    while True:
+        fn, args = _print_q.get()
+        try:
+            fn(*args)
+        except Exception:
+            pass
+
+threading.Thread(target=_printer, daemon=True).start()
+
+def _print_async(fn, *args):
+    """Queue a pretty-print call without blocking the request handler"""
+    global _dropped_prints
+    if not VERBOSE:
+        return
+    try:
+        _print_q.put_nowait((fn, args))
+    except queue.Full:
+        _dropped_prints += 1
+
+
+def _now_iso_cached(_cache=[0, '']):
+    """datetime.now().isoformat() memoized to one-second granularity"""
+    t = int(time.time())
+    if _cache[0] != t:
+        _cache[0] = t
+        _cache[1] = datetime.fromtimestamp(t).isoformat()
+    return _cache[1]
 
 def print_banner():
     """Print startup banner"""
@@ -28,15 +107,30 @@ def print_banner():
     print(f"{Fore.GREEN}✓ Ready to receive ticket creation requests{Style.RESET_ALL}")
     print(f"{Fore.YELLOW}➜ Endpoint: POST /rest/api/2/issue{Style.RESET_ALL}\n")
 
+# Static ANSI fragments used on every ticket, composed once at import
+# (colorama already strips escapes when stdout is not a TTY)
+_RST = Style.RESET_ALL
+_DIV = f"{Fore.CYAN}{'─' * 80}{_RST}"
+_L_TICKET = f"{Fore.WHITE}Ticket ID:   {Fore.GREEN}"
+_L_PRIORITY = f"{Fore.WHITE}Priority:    "
+_L_TYPE = f"{Fore.WHITE}Type:        {Fore.MAGENTA}"
+_L_SUMMARY = f"{Fore.WHITE}Summary:     {Fore.YELLOW}"
+_L_DESC = f"{Fore.WHITE}Description: {Fore.WHITE}"
+_L_LABELS = f"{Fore.WHITE}Labels:      {Fore.BLUE}"
+_L_COMPONENTS = f"{Fore.WHITE}Components:  {Fore.CYAN}"
+_L_CREATED = f"{Fore.WHITE}Created:     {Fore.GREEN}"
+
 def print_ticket(ticket):
     """Print ticket in a beautiful format"""
-    global ticket_counter
-    
+
+    if not VERBOSE:
+        return
+
     print(f"\n{Back.GREEN}{Fore.BLACK} NEW TICKET CREATED {Style.RESET_ALL}")
-    print(f"{Fore.CYAN}{'─' * 80}{Style.RESET_ALL}")
+    print(_DIV)
     
     # Ticket ID
-    print(f"{Fore.WHITE}Ticket ID:   {Fore.GREEN}{ticket['key']}{Style.RESET_ALL}")
+    print(f"{_L_TICKET}{ticket['key']}{_RST}")
     
     # Priority with color coding
     priority = ticket['fields'].get('priority', {}).get('name', 'Medium')
@@ -46,38 +140,38 @@ def print_ticket(ticket):
         'Medium': Fore.CYAN,
         'Low': Fore.GREEN
     }.get(priority, Fore.WHITE)
-    print(f"{Fore.WHITE}Priority:    {priority_color}{priority}{Style.RESET_ALL}")
+    print(f"{_L_PRIORITY}{priority_color}{priority}{_RST}")
     
     # Issue Type
     issue_type = ticket['fields'].get('issuetype', {}).get('name', 'Bug')
-    print(f"{Fore.WHITE}Type:        {Fore.MAGENTA}{issue_type}{Style.RESET_ALL}")
+    print(f"{_L_TYPE}{issue_type}{_RST}")
     
     # Summary
     summary = ticket['fields'].get('summary', 'No summary')
-    print(f"{Fore.WHITE}Summary:     {Fore.YELLOW}{summary}{Style.RESET_ALL}")
+    print(f"{_L_SUMMARY}{summary}{_RST}")
     
     # Description
     description = ticket['fields'].get('description', 'No description')
     if len(description) > 200:
         description = description[:200] + "..."
-    print(f"{Fore.WHITE}Description: {Fore.WHITE}{description}{Style.RESET_ALL}")
+    print(f"{_L_DESC}{description}{_RST}")
     
     # Labels
     labels = ticket['fields'].get('labels', [])
     if labels:
-        print(f"{Fore.WHITE}Labels:      {Fore.BLUE}{', '.join(labels)}{Style.RESET_ALL}")
+        print(f"{_L_LABELS}{', '.join(labels)}{_RST}")
     
     # Components
     components = ticket['fields'].get('components', [])
     if components:
         comp_names = [c.get('name', '') for c in components]
-        print(f"{Fore.WHITE}Components:  {Fore.CYAN}{', '.join(comp_names)}{Style.RESET_ALL}")
+        print(f"{_L_COMPONENTS}{', '.join(comp_names)}{_RST}")
     
     # Timestamp
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    print(f"{Fore.WHITE}Created:     {Fore.GREEN}{timestamp}{Style.RESET_ALL}")
+    print(f"{_L_CREATED}{timestamp}{_RST}")
     
-    print(f"{Fore.CYAN}{'─' * 80}{Style.RESET_ALL}")
+    print(_DIV)
     print(f"{Fore.GREEN}✓ Total tickets created: {len(tickets)}{Style.RESET_ALL}\n")
 
 @app.route('/health', methods=['GET'])
@@ -88,30 +182,34 @@ def health():
 @app.route('/rest/api/2/issue', methods=['POST'])
 def create_issue():
     """Simulate Jira issue creation"""
-    global ticket_counter
+    global _store_version
     
     try:
-        data = request.json
+        data = _load()
         
         # Generate ticket key
         project = data.get('fields', {}).get('project', {}).get('key', 'AGENT')
-        ticket_key = f"{project}-{ticket_counter}"
-        ticket_counter += 1
+        cid = next(ticket_counter)
+        ticket_key = f"{project}-{cid}"
         
         # Create ticket response
         ticket = {
-            'id': str(ticket_counter),
+            'id': str(cid),
             'key': ticket_key,
-            'self': f'http://localhost:8080/rest/api/2/issue/{ticket_counter}',
+            'self': f'http://localhost:8080/rest/api/2/issue/{cid}',
             'fields': data.get('fields', {}),
-            'created': datetime.now().isoformat()
+            'created': _now_iso_cached()
         }
         
-        # Store ticket
+        # Store ticket, dropping the oldest one's index entry when full
+        if len(tickets) == STORE_MAX:
+            tickets_by_key.pop(tickets[0]['key'], None)
         tickets.append(ticket)
+        tickets_by_key[ticket_key] = ticket
+        _store_version += 1
         
-        # Print beautiful output
-        print_ticket(ticket)
+        # Print beautiful output (off the request path)
+        _print_async(print_ticket, ticket)
         
         # Return Jira-like response
         return jsonify({
@@ -127,33 +225,62 @@ def create_issue():
 @app.route('/rest/api/2/issue/<issue_key>', methods=['GET'])
 def get_issue(issue_key):
     """Get ticket by key"""
-    for ticket in tickets:
-        if ticket['key'] == issue_key:
-            return jsonify(ticket), 200
+    ticket = tickets_by_key.get(issue_key)
+    if ticket:
+        return jsonify(ticket), 200
     return jsonify({'error': 'Issue not found'}), 404
 
 @app.route('/rest/api/2/search', methods=['GET', 'POST'])
 def search_issues():
     """Search tickets"""
-    return jsonify({
-        'startAt': 0,
-        'maxResults': len(tickets),
-        'total': len(tickets),
-        'issues': tickets
-    }), 200
+    snapshot = list(tickets)
+
+    def generate():
+        yield b'{"startAt":0,"maxResults":%d,"total":%d,"issues":' \
+            % (len(snapshot), len(snapshot))
+        yield from stream_json_array(snapshot)
+        yield b'}'
+
+    return Response(stream_with_context(generate()),
+                    mimetype='application/json')
 
 @app.route('/tickets', methods=['GET'])
 def list_tickets():
-    """List all tickets (custom endpoint for debugging)"""
-    return jsonify(tickets), 200
+    """List recent tickets (custom endpoint for debugging)
+
+    ?limit= and ?offset= select a window counted back from the newest
+    ticket, so only the requested slice is serialized.
+    """
+    limit = _int_arg('limit', 10)
+    offset = _int_arg('offset', 0)
+    etag = _etag_for(_store_version, limit, offset)
+    if request.headers.get('If-None-Match') == etag:
+        return '', 304
+    snapshot = list(tickets)
+    total = len(snapshot)
+    stop = max(0, total - offset)
+    window = snapshot[max(0, stop - limit):stop]
+
+    def generate():
+        yield b'{"total":%d,"tickets":' % total
+        yield from stream_json_array(window)
+        yield b'}'
+
+    resp = Response(stream_with_context(generate()),
+                    mimetype='application/json')
+    resp.headers['ETag'] = etag
+    resp.headers['Cache-Control'] = 'public, max-age=2'
+    return resp
 
 @app.route('/tickets/clear', methods=['POST'])
 def clear_tickets():
     """Clear all tickets (custom endpoint for testing)"""
-    global tickets, ticket_counter
+    global ticket_counter, _store_version
     count = len(tickets)
-    tickets = []
-    ticket_counter = 1000
+    tickets.clear()
+    _store_version += 1
+    tickets_by_key.clear()
+    ticket_counter = itertools.count(1000)
     print(f"{Fore.YELLOW}⚠ Cleared {count} tickets{Style.RESET_ALL}")
     return jsonify({'message': f'Cleared {count} tickets'}), 200
 
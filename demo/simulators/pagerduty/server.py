@@ -5,20 +5,105 @@ Receives incident alerts from AgentLog and displays them beautifully
 """
 
 from flask import Flask, request, jsonify, render_template
-import json
+import orjson
+import itertools
 import os
+from collections import deque
 from datetime import datetime
 from colorama import Fore, Back, Style, init
-import hashlib
+import queue
+import threading
+import time
 
 # Initialize colorama
 init(autoreset=True)
 
+# Set VERBOSE=0 to keep colorized printing off the request path
+VERBOSE = os.getenv('VERBOSE', '1') == '1'
+
 app = Flask(__name__)
 
-# Store incidents in memory
-incidents = []
-incident_counter = 1
+def ojson(obj, status=200):
+    """JSON response via orjson, much faster than stdlib json on big lists"""
+    return app.response_class(orjson.dumps(obj), status=status,
+                              mimetype='application/json')
+
+def _load():
+    """Parse the request body with orjson, skipping Flask's stdlib json path"""
+    return orjson.loads(request.get_data(cache=False))
+
+# Store incidents in memory (dict gives O(1) dedup_key lookups, bounded
+# deque preserves arrival order while capping memory via eviction)
+STORE_MAX = int(os.getenv('STORE_MAX', 10000))
+incidents = deque(maxlen=STORE_MAX)
+incidents_by_dedup = {}
+# itertools.count gives atomic-under-the-GIL increments, so concurrent
+# workers can't mint duplicate incident ids
+incident_counter = itertools.count(1)
+
+# Bumped on every insert/update/clear; listing ETags derive from it so
+# an unchanged store turns a poll into a 304 without rehashing the body
+_store_version = 0
+
+def _etag_for(*parts):
+    """Cheap ETag from the store version and the requested window"""
+    return '"%s"' % '-'.join(str(p) for p in parts)
+
+def _int_arg(name, default):
+    """Read a non-negative integer query param, falling back on bad input"""
+    try:
+        return max(0, int(request.args.get(name, default)))
+    except ValueError:
+        return default
+
+# Incrementally maintained status counts so /incidents and the console
+# output don't rescan the whole store on every call
+status_counts = {'triggered': 0, 'acknowledged': 0, 'resolved': 0}
+counts_lock = threading.Lock()
+
+def _count_status_change(old_status, new_status):
+    """Shift one incident between status buckets"""
+    with counts_lock:
+        if old_status in status_counts and status_counts[old_status] > 0:
+            status_counts[old_status] -= 1
+        if new_status in status_counts:
+            status_counts[new_status] += 1
+
+# Pretty-printing runs on a background thread so handlers return as soon
+# as the store is updated; on overflow prints are dropped rather than
+# letting a slow console backpressure ingestion
+_print_q = queue.Queue(maxsize=1024)
+_dropped_prints = 0
+
+def _printer():
+    """Drain the print queue"""
+    while True:
+        fn, args = _print_q.get()
+        try:
+            fn(*args)
+        except Exception:
+            pass
+
+threading.Thread(target=_printer, daemon=True).start()
+
+def _print_async(fn, *args):
+    """Queue a pretty-print call without blocking the request handler"""
+    global _dropped_prints
+    if not VERBOSE:
+        return
+    try:
+        _print_q.put_nowait((fn, args))
+    except queue.Full:
+        _dropped_prints += 1
+
+
+def _now_iso_cached(_cache=[0, '']):
+    """datetime.now().isoformat() memoized to one-second granularity"""
+    t = int(time.time())
+    if _cache[0] != t:
+        _cache[0] = t
+        _cache[1] = datetime.fromtimestamp(t).isoformat()
+    return _cache[1]
 
 def print_banner():
     """Print startup banner"""
@@ -29,9 +114,25 @@ def print_banner():
     print(f"{Fore.GREEN}✓ Ready to receive incident alerts{Style.RESET_ALL}")
     print(f"{Fore.YELLOW}➜ Endpoint: POST /v2/enqueue{Style.RESET_ALL}\n")
 
+# Static ANSI fragments used on every incident, composed once at import
+# (colorama already strips escapes when stdout is not a TTY)
+_RST = Style.RESET_ALL
+_DIV = f"{Fore.CYAN}{'─' * 80}{_RST}"
+_L_DEDUP = f"{Fore.WHITE}Dedup Key:   {Fore.CYAN}"
+_L_SEVERITY = f"{Fore.WHITE}Severity:    "
+_L_SUMMARY = f"{Fore.WHITE}Summary:     {Fore.YELLOW}"
+_L_SOURCE = f"{Fore.WHITE}Source:      {Fore.MAGENTA}"
+_L_TS = f"{Fore.WHITE}Timestamp:   {Fore.GREEN}"
+_L_COMPONENT = f"{Fore.WHITE}Component:   {Fore.BLUE}"
+_L_GROUP = f"{Fore.WHITE}Group:       {Fore.BLUE}"
+_L_CLASS = f"{Fore.WHITE}Class:       {Fore.BLUE}"
+
 def print_incident(incident, action):
     """Print incident in a beautiful format"""
-    
+
+    if not VERBOSE:
+        return
+
     if action == 'trigger':
         header_color = Back.RED
         action_text = "🚨 INCIDENT TRIGGERED"
@@ -46,11 +147,11 @@ def print_incident(incident, action):
         action_text = f"• INCIDENT {action.upper()}"
     
     print(f"\n{header_color}{Fore.BLACK} {action_text} {Style.RESET_ALL}")
-    print(f"{Fore.CYAN}{'─' * 80}{Style.RESET_ALL}")
+    print(_DIV)
     
     # Incident Key (Dedup Key)
     dedup_key = incident.get('dedup_key', 'N/A')
-    print(f"{Fore.WHITE}Dedup Key:   {Fore.CYAN}{dedup_key}{Style.RESET_ALL}")
+    print(f"{_L_DEDUP}{dedup_key}{_RST}")
     
     # Severity with color coding
     payload = incident.get('payload', {})
@@ -61,34 +162,34 @@ def print_incident(incident, action):
         'warning': Fore.YELLOW,
         'info': Fore.CYAN
     }.get(severity, Fore.WHITE)
-    print(f"{Fore.WHITE}Severity:    {severity_color}{severity.upper()}{Style.RESET_ALL}")
+    print(f"{_L_SEVERITY}{severity_color}{severity.upper()}{_RST}")
     
     # Summary
     summary = payload.get('summary', 'No summary')
-    print(f"{Fore.WHITE}Summary:     {Fore.YELLOW}{summary}{Style.RESET_ALL}")
+    print(f"{_L_SUMMARY}{summary}{_RST}")
     
     # Source
     source = payload.get('source', 'unknown')
-    print(f"{Fore.WHITE}Source:      {Fore.MAGENTA}{source}{Style.RESET_ALL}")
+    print(f"{_L_SOURCE}{source}{_RST}")
     
     # Timestamp
     timestamp = payload.get('timestamp', datetime.now().isoformat())
-    print(f"{Fore.WHITE}Timestamp:   {Fore.GREEN}{timestamp}{Style.RESET_ALL}")
+    print(f"{_L_TS}{timestamp}{_RST}")
     
     # Component
     component = payload.get('component', '')
     if component:
-        print(f"{Fore.WHITE}Component:   {Fore.BLUE}{component}{Style.RESET_ALL}")
+        print(f"{_L_COMPONENT}{component}{_RST}")
     
     # Group
     group = payload.get('group', '')
     if group:
-        print(f"{Fore.WHITE}Group:       {Fore.BLUE}{group}{Style.RESET_ALL}")
+        print(f"{_L_GROUP}{group}{_RST}")
     
     # Class
     event_class = payload.get('class', '')
     if event_class:
-        print(f"{Fore.WHITE}Class:       {Fore.BLUE}{event_class}{Style.RESET_ALL}")
+        print(f"{_L_CLASS}{event_class}{_RST}")
     
     # Custom Details
     custom_details = payload.get('custom_details', {})
@@ -97,13 +198,14 @@ def print_incident(incident, action):
         for key, value in custom_details.items():
             print(f"  {Fore.LIGHTBLACK_EX}• {key}: {Fore.WHITE}{value}{Style.RESET_ALL}")
     
-    print(f"{Fore.CYAN}{'─' * 80}{Style.RESET_ALL}")
+    print(_DIV)
     
     # Statistics
-    triggered = len([i for i in incidents if i.get('status') == 'triggered'])
-    acknowledged = len([i for i in incidents if i.get('status') == 'acknowledged'])
-    resolved = len([i for i in incidents if i.get('status') == 'resolved'])
-    
+    with counts_lock:
+        triggered = status_counts['triggered']
+        acknowledged = status_counts['acknowledged']
+        resolved = status_counts['resolved']
+
     print(f"{Fore.RED}■ Triggered: {triggered}  {Fore.YELLOW}■ Acknowledged: {acknowledged}  {Fore.GREEN}■ Resolved: {resolved}{Style.RESET_ALL}\n")
 
 @app.route('/health', methods=['GET'])
@@ -114,43 +216,51 @@ def health():
 @app.route('/v2/enqueue', methods=['POST'])
 def enqueue_event():
     """Simulate PagerDuty Events API v2"""
-    global incident_counter
+    global _store_version
     
     try:
-        data = request.json
+        data = _load()
         event = data.get('event', {})
         
         # Extract event details
         routing_key = data.get('routing_key', 'unknown')
         event_action = event.get('event_action', 'trigger')
-        dedup_key = event.get('dedup_key', f'incident-{incident_counter}')
+        dedup_key = event.get('dedup_key')
         payload = event.get('payload', {})
         
         # Find or create incident
-        incident = None
-        for inc in incidents:
-            if inc.get('dedup_key') == dedup_key:
-                incident = inc
-                break
-        
+        incident = incidents_by_dedup.get(dedup_key) if dedup_key else None
+
         if not incident:
+            cid = next(incident_counter)
+            if not dedup_key:
+                dedup_key = f'incident-{cid}'
             incident = {
-                'id': incident_counter,
+                'id': cid,
                 'dedup_key': dedup_key,
                 'status': event_action,
                 'payload': payload,
                 'routing_key': routing_key,
-                'created_at': datetime.now().isoformat(),
-                'updated_at': datetime.now().isoformat()
+                'created_at': _now_iso_cached(),
+                'updated_at': _now_iso_cached()
             }
+            # Drop the oldest incident's index and count entries when full
+            if len(incidents) == STORE_MAX:
+                evicted = incidents[0]
+                incidents_by_dedup.pop(evicted['dedup_key'], None)
+                _count_status_change(evicted['status'], None)
             incidents.append(incident)
-            incident_counter += 1
+            incidents_by_dedup[dedup_key] = incident
+            _count_status_change(None, event_action)
         else:
+            _count_status_change(incident['status'], event_action)
             incident['status'] = event_action
-            incident['updated_at'] = datetime.now().isoformat()
+            incident['updated_at'] = _now_iso_cached()
         
-        # Print beautiful output
-        print_incident(incident, event_action)
+        _store_version += 1
+
+        # Print beautiful output (off the request path)
+        _print_async(print_incident, incident, event_action)
         
         # Return PagerDuty-like response
         return jsonify({
@@ -167,9 +277,10 @@ def enqueue_event():
 def enqueue_change():
     """Simulate PagerDuty Change Events API"""
     try:
-        data = request.json
-        print(f"\n{Back.BLUE}{Fore.WHITE} CHANGE EVENT {Style.RESET_ALL}")
-        print(f"{Fore.CYAN}Change: {json.dumps(data, indent=2)}{Style.RESET_ALL}\n")
+        data = _load()
+        if VERBOSE:
+            print(f"\n{Back.BLUE}{Fore.WHITE} CHANGE EVENT {Style.RESET_ALL}")
+            print(f"{Fore.CYAN}Change: {orjson.dumps(data, option=orjson.OPT_INDENT_2).decode()}{Style.RESET_ALL}\n")
         
         return jsonify({
             'status': 'success',
@@ -181,26 +292,42 @@ def enqueue_change():
 
 @app.route('/incidents', methods=['GET'])
 def list_incidents():
-    """List all incidents (custom endpoint for debugging)"""
-    # Calculate statistics
-    stats = {
-        'triggered': sum(1 for i in incidents if i['status'] == 'triggered'),
-        'acknowledged': sum(1 for i in incidents if i['status'] == 'acknowledged'),
-        'resolved': sum(1 for i in incidents if i['status'] == 'resolved')
-    }
-    return jsonify({
-        'total': len(incidents),
-        'incidents': incidents,
+    """List recent incidents (custom endpoint for debugging)
+
+    ?limit= and ?offset= select a window counted back from the newest
+    incident, so only the requested slice is serialized.
+    """
+    limit = _int_arg('limit', 10)
+    offset = _int_arg('offset', 0)
+    etag = _etag_for(_store_version, limit, offset)
+    if request.headers.get('If-None-Match') == etag:
+        return '', 304
+    with counts_lock:
+        stats = dict(status_counts)
+    snapshot = list(incidents)
+    total = len(snapshot)
+    stop = max(0, total - offset)
+    resp = ojson({
+        'total': total,
+        'incidents': snapshot[max(0, stop - limit):stop],
         'stats': stats
-    }), 200
+    })
+    resp.headers['ETag'] = etag
+    resp.headers['Cache-Control'] = 'public, max-age=2'
+    return resp
 
 @app.route('/incidents/clear', methods=['POST'])
 def clear_incidents():
     """Clear all incidents (custom endpoint for testing)"""
-    global incidents, incident_counter
+    global incident_counter, _store_version
     count = len(incidents)
-    incidents = []
-    incident_counter = 1
+    incidents.clear()
+    _store_version += 1
+    incidents_by_dedup.clear()
+    incident_counter = itertools.count(1)
+    with counts_lock:
+        for status in status_counts:
+            status_counts[status] = 0
     print(f"{Fore.YELLOW}⚠ Cleared {count} incidents{Style.RESET_ALL}")
     return jsonify({'message': f'Cleared {count} incidents'}), 200
 
@@ -0,0 +1,10 @@
+#!/usr/bin/env python3
+"""
+WSGI entry point: gunicorn -k gevent -w 1 --worker-connections 1000 wsgi:app
+
+Run with a single worker: the incident store lives in process memory, so
+multiple workers would each see a different subset of the data. One
+gevent worker still serves hundreds of concurrent connections.
+"""
+
+from server import app  # noqa: F401
@@ -4,19 +4,93 @@ Mock Slack Server - Simulates Slack Incoming Webhooks
 Receives notifications from AgentLog and displays them beautifully
 """
 
-from flask import Flask, request, jsonify, render_template
-import json
+from flask import Flask, request, jsonify, render_template, Response, stream_with_context
+import orjson
 import os
+import queue
+import threading
+import time
+from collections import deque
 from datetime import datetime
 from colorama import Fore, Back, Style, init
 
 # Initialize colorama
 init(autoreset=True)
 
+# Set VERBOSE=0 to keep colorized printing off the request path
+VERBOSE = os.getenv('VERBOSE', '1') == '1'
+
 app = Flask(__name__)
 
-# Store messages in memory
-messages = []
+def _load():
+    """Parse the request body with orjson, skipping Flask's stdlib json path"""
+    return orjson.loads(request.get_data(cache=False))
+
+def stream_json_array(items):
+    """Yield a JSON array chunk by chunk instead of building one big blob"""
+    yield b'['
+    first = True
+    for item in items:
+        if not first:
+            yield b','
+        yield orjson.dumps(item)
+        first = False
+    yield b']'
+
+# Store messages in memory (bounded deque caps memory via eviction)
+STORE_MAX = int(os.getenv('STORE_MAX', 10000))
+messages = deque(maxlen=STORE_MAX)
+
+# Bumped on every insert/clear; listing ETags derive from it so an
+# unchanged store turns a poll into a 304 without rehashing the body
+_store_version = 0
+
+def _etag_for(*parts):
+    """Cheap ETag from the store version and the requested window"""
+    return '"%s"' % '-'.join(str(p) for p in parts)
+
+def _int_arg(name, default):
+    """Read a non-negative integer query param, falling back on bad input"""
+    try:
+        return max(0, int(request.args.get(name, default)))
+    except ValueError:
+        return default
+
+# Pretty-printing runs on a background thread so handlers return as soon
+# as the store is updated; on overflow prints are dropped rather than
+# letting a slow console backpressure ingestion
+_print_q = queue.Queue(maxsize=1024)
+_dropped_prints = 0
+
+def _printer():
+    """Drain the print queue"""
+    while True:
+        fn, args = _print_q.get()
+        try:
+            fn(*args)
+        except Exception:
+            pass
+
+threading.Thread(target=_printer, daemon=True).start()
+
+def _print_async(fn, *args):
+    """Queue a pretty-print call without blocking the request handler"""
+    global _dropped_prints
+    if not VERBOSE:
+        return
+    try:
+        _print_q.put_nowait((fn, args))
+    except queue.Full:
+        _dropped_prints += 1
+
+
+def _now_iso_cached(_cache=[0, '']):
+    """datetime.now().isoformat() memoized to one-second granularity"""
+    t = int(time.time())
+    if _cache[0] != t:
+        _cache[0] = t
+        _cache[1] = datetime.fromtimestamp(t).isoformat()
+    return _cache[1]
 
 def print_banner():
     """Print startup banner"""
@@ -39,32 +113,45 @@ def get_color_emoji(color):
     }
     return color_map.get(color, ('🔵', Fore.BLUE))
 
+# Static ANSI fragments used on every message, composed once at import
+# (colorama already strips escapes when stdout is not a TTY)
+_RST = Style.RESET_ALL
+_DIV = f"{Fore.MAGENTA}{'─' * 80}{_RST}"
+_L_CHANNEL = f"{Fore.WHITE}Channel:     {Fore.CYAN}"
+_L_FROM = f"{Fore.WHITE}From:        {Fore.YELLOW}"
+_L_ICON = f"{Fore.WHITE}Icon:        {Fore.BLUE}"
+_L_TEXT = f"{Fore.WHITE}Message:     {Fore.WHITE}"
+_L_RECEIVED = f"{Fore.WHITE}Received:    {Fore.GREEN}"
+
 def print_message(message):
     """Print Slack message in a beautiful format"""
-    
+
+    if not VERBOSE:
+        return
+
     print(f"\n{Back.MAGENTA}{Fore.BLACK} NEW SLACK MESSAGE {Style.RESET_ALL}")
-    print(f"{Fore.MAGENTA}{'─' * 80}{Style.RESET_ALL}")
+    print(_DIV)
     
     # Channel (if specified)
     channel = message.get('channel', '#general')
-    print(f"{Fore.WHITE}Channel:     {Fore.CYAN}{channel}{Style.RESET_ALL}")
+    print(f"{_L_CHANNEL}{channel}{_RST}")
     
     # Username
     username = message.get('username', 'AgentLog Bot')
-    print(f"{Fore.WHITE}From:        {Fore.YELLOW}{username}{Style.RESET_ALL}")
+    print(f"{_L_FROM}{username}{_RST}")
     
     # Icon
     icon_emoji = message.get('icon_emoji', ':robot_face:')
     icon_url = message.get('icon_url', '')
     if icon_url:
-        print(f"{Fore.WHITE}Icon:        {Fore.BLUE}{icon_url}{Style.RESET_ALL}")
+        print(f"{_L_ICON}{icon_url}{_RST}")
     else:
-        print(f"{Fore.WHITE}Icon:        {Fore.BLUE}{icon_emoji}{Style.RESET_ALL}")
+        print(f"{_L_ICON}{icon_emoji}{_RST}")
     
     # Text
     text = message.get('text', '')
     if text:
-        print(f"{Fore.WHITE}Message:     {Fore.WHITE}{text}{Style.RESET_ALL}")
+        print(f"{_L_TEXT}{text}{_RST}")
     
     # Attachments
     attachments = message.get('attachments', [])
@@ -147,9 +234,9 @@ def print_message(message):
     
     # Timestamp
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    print(f"\n{Fore.WHITE}Received:    {Fore.GREEN}{timestamp}{Style.RESET_ALL}")
+    print(f"\n{_L_RECEIVED}{timestamp}{_RST}")
     
-    print(f"{Fore.MAGENTA}{'─' * 80}{Style.RESET_ALL}")
+    print(_DIV)
     print(f"{Fore.GREEN}✓ Total messages received: {len(messages)}{Style.RESET_ALL}\n")
 
 @app.route('/health', methods=['GET'])
@@ -160,19 +247,20 @@ def health():
 @app.route('/services/<path:webhook_path>', methods=['POST'])
 def incoming_webhook(webhook_path):
     """Simulate Slack incoming webhook"""
+    global _store_version
     try:
-        data = request.json
+        data = _load()
         
         # Store message
-        message = {
-            'webhook_path': webhook_path,
-            'timestamp': datetime.now().isoformat(),
-            **data
-        }
-        messages.append(message)
-        
-        # Print beautiful output
-        print_message(message)
+        # Annotate the parsed body in place; spreading it into a fresh
+        # dict copied every top-level key per request for no gain
+        data['_webhook_path'] = webhook_path
+        data['_received_ts'] = _now_iso_cached()
+        messages.append(data)
+        _store_version += 1
+
+        # Print beautiful output (off the request path)
+        _print_async(print_message, data)
         
         # Return Slack-like response
         return jsonify({'ok': True}), 200
@@ -184,25 +272,26 @@ def incoming_webhook(webhook_path):
 @app.route('/api/chat.postMessage', methods=['POST'])
 def post_message():
     """Simulate Slack chat.postMessage API"""
+    global _store_version
     try:
-        data = request.json
+        data = _load()
         
         # Store message
-        message = {
-            'api': 'chat.postMessage',
-            'timestamp': datetime.now().isoformat(),
-            **data
-        }
-        messages.append(message)
-        
-        # Print beautiful output
-        print_message(message)
+        # Annotate the parsed body in place; spreading it into a fresh
+        # dict copied every top-level key per request for no gain
+        data['_api'] = 'chat.postMessage'
+        data['_received_ts'] = _now_iso_cached()
+        messages.append(data)
+        _store_version += 1
+
+        # Print beautiful output (off the request path)
+        _print_async(print_message, data)
         
         # Return Slack-like response
         return jsonify({
             'ok': True,
             'channel': data.get('channel', 'C1234567890'),
-            'ts': str(int(datetime.now().timestamp())),
+            'ts': str(int(time.time())),
             'message': {
                 'text': data.get('text', ''),
                 'username': data.get('username', 'bot'),
@@ -218,15 +307,39 @@ def post_message():
 
 @app.route('/messages', methods=['GET'])
 def list_messages():
-    """List all messages (custom endpoint for debugging)"""
-    return jsonify(messages), 200
+    """List recent messages (custom endpoint for debugging)
+
+    ?limit= and ?offset= select a window counted back from the newest
+    message, so only the requested slice is serialized.
+    """
+    limit = _int_arg('limit', 10)
+    offset = _int_arg('offset', 0)
+    etag = _etag_for(_store_version, limit, offset)
+    if request.headers.get('If-None-Match') == etag:
+        return '', 304
+    snapshot = list(messages)
+    total = len(snapshot)
+    stop = max(0, total - offset)
+    window = snapshot[max(0, stop - limit):stop]
+
+    def generate():
+        yield b'{"total":%d,"messages":' % total
+        yield from stream_json_array(window)
+        yield b'}'
+
+    resp = Response(stream_with_context(generate()),
+                    mimetype='application/json')
+    resp.headers['ETag'] = etag
+    resp.headers['Cache-Control'] = 'public, max-age=2'
+    return resp
 
 @app.route('/messages/clear', methods=['POST'])
 def clear_messages():
     """Clear all messages (custom endpoint for testing)"""
-    global messages
+    global _store_version
     count = len(messages)
-    messages = []
+    messages.clear()
+    _store_version += 1
     print(f"{Fore.YELLOW}⚠ Cleared {count} messages{Style.RESET_ALL}")
     return jsonify({'message': f'Cleared {count} messages'}), 200
 